@@ -11,12 +11,28 @@ from datetime import datetime, timedelta
 import json
 import os
 
+# Demande de base par heure de la journée (m³/h): irrigation tôt le matin et
+# en soirée, minimale à midi (évaporation) et la nuit (sécurité)
+HOUR_BASE_DEMAND = np.full(24, 50.0)
+HOUR_BASE_DEMAND[5:9] = 120    # Matin (optimal)
+HOUR_BASE_DEMAND[18:22] = 100  # Soir (2ème session)
+HOUR_BASE_DEMAND[11:16] = 30   # Midi (évaporation élevée)
+HOUR_BASE_DEMAND[22:] = 20     # Nuit (minimal - sécurité)
+HOUR_BASE_DEMAND[:5] = 20
+
+# Multiplicateur saisonnier par mois (index = mois-1): saison sèche intensive
+# (nov-avr), saison des pluies réduite (juin-sept), transitions (mai, oct)
+MONTH_MULTIPLIER = np.array([1.35, 1.35, 1.35, 1.35, 0.85, 0.60,
+                             0.60, 0.60, 0.60, 0.85, 1.35, 1.35])
+
 class AgriIrrigationDataGenerator:
-    def __init__(self, start_date, days=30, num_pumps=3):
+    def __init__(self, start_date, days=30, num_pumps=3, seed=None):
         self.start_date = pd.to_datetime(start_date)
         self.days = days
         self.num_pumps = num_pumps
         self.hours_per_day = 24
+        self.seed = seed
+        self.rng = np.random.default_rng(seed)  # PCG64, tirages en lot
         
         # Paramètres réalistes ferme agricole Sahel
         self.tariff_peak = 110      # FCFA/kWh heures pleines (réseau SONABEL)
@@ -32,55 +48,39 @@ class AgriIrrigationDataGenerator:
             {"id": "P3", "capacity_m3h": 55, "power_kw": 42, "efficiency": 0.73, "age_years": 3, "type": "appoint"},
         ]
         
-    def generate_demand_pattern(self):
-        """Génère pattern de demande irrigation réaliste pour ferme maraîchère"""
-        hours = self.days * self.hours_per_day
-        timestamps = [self.start_date + timedelta(hours=h) for h in range(hours)]
-        
-        demand = []
-        for ts in timestamps:
-            hour = ts.hour
-            day_of_week = ts.weekday()
-            day_of_month = ts.day
-            
-            # Pattern irrigation journalier (m³/h)
-            # Irrigation principalement tôt le matin et en soirée (évaporation minimale)
-            base_demand = 50
-            
-            # Pics irrigation optimaux
-            if 5 <= hour <= 8:  # Matin (optimal pour irrigation)
-                base_demand = 120
-            elif 18 <= hour <= 21:  # Soir (2ème session)
-                base_demand = 100
-            elif 11 <= hour <= 15:  # Midi - minimiser (évaporation élevée)
-                base_demand = 30
-            elif 22 <= hour or hour <= 4:  # Nuit (minimal - sécurité)
-                base_demand = 20
-                
-            # Pas de weekend en agriculture
-            # Légère réduction dimanche (maintenance)
-            if day_of_week == 6:
-                base_demand *= 0.70
-                
-            # Variation saisonnière (cultures)
-            month = ts.month
-            if month in [11, 12, 1, 2, 3, 4]:  # Saison sèche - irrigation intensive
-                base_demand *= 1.35
-            elif month in [6, 7, 8, 9]:  # Saison pluies - irrigation réduite
-                base_demand *= 0.60
-            elif month in [5, 10]:  # Transitions
-                base_demand *= 0.85
-                
-            # Cycles culturaux (peaks tous les 7-10 jours)
-            if day_of_month % 7 in [1, 2]:  # Pics besoins après semis/repiquage
-                base_demand *= 1.20
-                
-            # Ajouter variabilité réaliste (météo, évaporation)
-            noise = np.random.normal(0, base_demand * 0.12)
-            final_demand = max(15, base_demand + noise)
-            
-            demand.append(final_demand)
-            
+    def generate_demand_pattern(self, start_date=None, days=None):
+        """Génère pattern de demande irrigation réaliste pour ferme maraîchère
+
+        Args:
+            start_date: Début de la fenêtre (défaut: self.start_date)
+            days: Durée de la fenêtre en jours (défaut: self.days)
+        """
+        start = self.start_date if start_date is None else pd.to_datetime(start_date)
+        days = self.days if days is None else days
+        hours = days * self.hours_per_day
+        timestamps = pd.date_range(start, periods=hours, freq='h')
+
+        # Accès colonnaire (un seul appel C par attribut au lieu de N appels Python)
+        hour = timestamps.hour.to_numpy()
+        day_of_week = timestamps.dayofweek.to_numpy()
+        day_of_month = timestamps.day.to_numpy()
+        month = timestamps.month.to_numpy()
+
+        # Pattern irrigation journalier et variation saisonnière par simple
+        # indexation dans les tables (sans branches ni masques intermédiaires)
+        base_demand = HOUR_BASE_DEMAND[hour] * MONTH_MULTIPLIER[month - 1]
+
+        # Pas de weekend en agriculture
+        # Légère réduction dimanche (maintenance)
+        base_demand *= np.where(day_of_week == 6, 0.70, 1.0)
+
+        # Cycles culturaux (peaks tous les 7-10 jours)
+        base_demand *= np.where(np.isin(day_of_month % 7, [1, 2]), 1.20, 1.0)
+
+        # Ajouter variabilité réaliste (météo, évaporation)
+        noise = self.rng.normal(0, base_demand * 0.12)
+        demand = np.maximum(15, base_demand + noise)
+
         return timestamps, demand
     
     def calculate_pump_energy(self, flow, pump_config, hour_running):
@@ -94,7 +94,7 @@ class AgriIrrigationDataGenerator:
         age_factor = 1 + (pump_config["age_years"] * 0.02)  # 2% perte/an
         
         # Variabilité opérationnelle
-        operational_variance = np.random.uniform(0.95, 1.05)
+        operational_variance = self.rng.uniform(0.95, 1.05)
         
         # Puissance réelle
         actual_power = (theoretical_power / efficiency) * age_factor * operational_variance
@@ -103,96 +103,91 @@ class AgriIrrigationDataGenerator:
     
     def generate_pump_data(self, timestamps, demand):
         """Génère données de pompage basées sur demande - BASELINE (non optimisé)"""
-        
-        data = []
-        
-        for i, (ts, dem) in enumerate(zip(timestamps, demand)):
-            hour = ts.hour
-            
-            # Stratégie BASELINE naive: activer pompes par ordre jusqu'à satisfaire demande
-            active_pumps = []
-            remaining_demand = dem
-            total_power = 0
-            total_flow = 0
-            
-            # Activation séquentielle des pompes
-            for pump in self.pump_configs:
-                if remaining_demand > 0:
-                    # Débit fourni par cette pompe
-                    flow = min(pump["capacity_m3h"], remaining_demand)
-                    
-                    # Calcul consommation énergétique
-                    power_used = self.calculate_pump_energy(flow, pump, i % 24)
-                    
-                    # Possibilité de fuite (10% des enregistrements)
-                    leak_detected = False
-                    leak_factor = 1.0
-                    if np.random.random() < 0.10:
-                        leak_detected = True
-                        leak_factor = np.random.uniform(1.08, 1.20)
-                        power_used *= leak_factor  # Surconsommation due à fuite
-                    
-                    active_pumps.append({
-                        "pump_id": pump["id"],
-                        "flow_m3h": flow,
-                        "power_kw": power_used,
-                        "status": "ON",
-                        "leak_detected": leak_detected
-                    })
-                    
-                    total_power += power_used
-                    total_flow += flow
-                    remaining_demand -= flow
-                else:
-                    active_pumps.append({
-                        "pump_id": pump["id"],
-                        "flow_m3h": 0,
-                        "power_kw": 0,
-                        "status": "OFF",
-                        "leak_detected": False
-                    })
-            
-            # Calcul tarifaire
-            tariff = self.tariff_offpeak if (hour < 7 or hour >= 23) else self.tariff_peak
-            
-            # Calcul pénalités si dépassement puissance souscrite
-            penalty = 0
-            if total_power > self.subscribed_power:
-                exceeded_power = total_power - self.subscribed_power
-                penalty = exceeded_power * self.penalty_rate
-            
-            # Coûts
-            energy_cost = total_power * tariff
-            total_cost = energy_cost + penalty
-            
-            # Enregistrement pour chaque pompe
-            for pump_data in active_pumps:
-                num_active = len([p for p in active_pumps if p["status"] == "ON"])
-                
-                data.append({
-                    "timestamp": ts,
-                    "hour": hour,
-                    "day_of_week": ts.weekday(),
-                    "pump_id": pump_data["pump_id"],
-                    "demand_m3h": dem,
-                    "flow_m3h": pump_data["flow_m3h"],
-                    "power_kw": pump_data["power_kw"],
-                    "status": pump_data["status"],
-                    "tariff_fcfa_kwh": tariff,
-                    "tariff_type": "offpeak" if (hour < 7 or hour >= 23) else "peak",
-                    "energy_cost_fcfa": pump_data["power_kw"] * tariff,
-                    "penalty_fcfa": penalty / num_active if (num_active > 0 and penalty > 0) else 0,
-                    "total_cost_fcfa": (pump_data["power_kw"] * tariff + (penalty / num_active if num_active > 0 else 0)),
-                    "total_power_kw": total_power,
-                    "subscribed_power_kw": self.subscribed_power,
-                    "power_exceeded": total_power > self.subscribed_power,
-                    "leak_detected": pump_data["leak_detected"]
-                })
-        
-        return pd.DataFrame(data)
+
+        timestamps = pd.DatetimeIndex(timestamps)
+        demand = np.asarray(demand, dtype=float)
+        num_hours = len(demand)
+        num_pumps = len(self.pump_configs)
+
+        # Paramètres pompes sous forme de vecteurs (num_pumps,)
+        capacity = np.array([p["capacity_m3h"] for p in self.pump_configs], dtype=float)
+        rated_power = np.array([p["power_kw"] for p in self.pump_configs], dtype=float)
+        efficiency = np.array([p["efficiency"] for p in self.pump_configs])
+        age_years = np.array([p["age_years"] for p in self.pump_configs])
+
+        # Stratégie BASELINE naive: activer pompes par ordre jusqu'à satisfaire demande
+        # Allocation séquentielle exprimée en cumulé: chaque pompe sert ce qui
+        # reste après les pompes précédentes, borné à sa capacité
+        served_before = np.concatenate(([0.0], np.cumsum(capacity)[:-1]))
+        flow = np.clip(demand[:, None] - served_before[None, :], 0, capacity[None, :])
+
+        # Calcul consommation énergétique (calculate_pump_energy vectorisé)
+        theoretical_power = (flow / capacity) * rated_power
+        age_factor = 1 + (age_years * 0.02)  # 2% perte/an
+        operational_variance = self.rng.uniform(0.95, 1.05, size=(num_hours, num_pumps))
+        power = (theoretical_power / efficiency) * age_factor * operational_variance
+
+        # Possibilité de fuite (10% des enregistrements) - surconsommation
+        leak_detected = self.rng.random((num_hours, num_pumps)) < 0.10
+        leak_factor = np.where(leak_detected, self.rng.uniform(1.08, 1.20, size=(num_hours, num_pumps)), 1.0)
+        power *= leak_factor
+
+        # Les pompes à l'arrêt ne consomment pas et ne fuient pas
+        is_on = flow > 0
+        power[~is_on] = 0.0
+        leak_detected[~is_on] = False
+
+        total_power = power.sum(axis=1)
+
+        # Calcul tarifaire
+        hour = timestamps.hour.to_numpy()
+        is_peak = (hour >= 7) & (hour < 23)
+        tariff = np.where(is_peak, self.tariff_peak, self.tariff_offpeak)
+
+        # Calcul pénalités si dépassement puissance souscrite
+        exceeded_power = np.maximum(total_power - self.subscribed_power, 0)
+        penalty = exceeded_power * self.penalty_rate
+
+        # Pénalité répartie entre les pompes actives de l'heure
+        num_active = is_on.sum(axis=1)
+        penalty_share = np.divide(penalty, num_active,
+                                  out=np.zeros(num_hours), where=num_active > 0)
+
+        # Aplatir la grille (heures, pompes) en colonnes - une ligne par pompe/heure
+        tariff_rep = np.repeat(tariff, num_pumps)
+        penalty_rep = np.repeat(penalty_share, num_pumps)
+        energy_cost = power.ravel() * tariff_rep
+
+        # Dtypes compacts: float32 pour les grandeurs physiques/coûts, uint8 pour
+        # les champs calendaires, catégories pour les colonnes à faible cardinalité.
+        # Les lecteurs aval (optimizer.py) ne doivent pas supposer du float64.
+        return pd.DataFrame({
+            "timestamp": np.repeat(timestamps.to_numpy(), num_pumps),
+            "hour": np.repeat(hour, num_pumps).astype(np.uint8),
+            "day_of_week": np.repeat(timestamps.dayofweek.to_numpy(), num_pumps).astype(np.uint8),
+            "pump_id": pd.Categorical(np.tile([p["id"] for p in self.pump_configs], num_hours)),
+            "demand_m3h": np.repeat(demand, num_pumps).astype(np.float32),
+            "flow_m3h": flow.ravel().astype(np.float32),
+            "power_kw": power.ravel().astype(np.float32),
+            "status": pd.Categorical(np.where(is_on.ravel(), "ON", "OFF")),
+            "tariff_fcfa_kwh": tariff_rep.astype(np.float32),
+            "tariff_type": pd.Categorical(np.where(np.repeat(is_peak, num_pumps), "peak", "offpeak")),
+            "energy_cost_fcfa": energy_cost.astype(np.float32),
+            "penalty_fcfa": penalty_rep.astype(np.float32),
+            "total_cost_fcfa": (energy_cost + penalty_rep).astype(np.float32),
+            "total_power_kw": np.repeat(total_power, num_pumps).astype(np.float32),
+            "subscribed_power_kw": np.float32(self.subscribed_power),
+            "power_exceeded": np.repeat(total_power > self.subscribed_power, num_pumps),
+            "leak_detected": leak_detected.ravel()
+        })
     
-    def generate_dataset(self, output_file="data/pumping_data.csv"):
-        """Génère dataset complet et sauvegarde"""
+    def generate_dataset(self, output_file="data/pumping_data.csv", output_format=None):
+        """Génère dataset complet et sauvegarde (CSV ou Parquet)
+
+        Args:
+            output_file: Chemin de sortie
+            output_format: 'csv' ou 'parquet' (déduit de l'extension si None)
+        """
         
         print("="*60)
         print("AGRIWATER - GÉNÉRATEUR DONNÉES IRRIGATION")
@@ -219,7 +214,17 @@ class AgriIrrigationDataGenerator:
         os.makedirs(os.path.dirname(output_file) if os.path.dirname(output_file) else ".", exist_ok=True)
         
         # Sauvegarder
-        df.to_csv(output_file, index=False)
+        # Parquet (pyarrow): écriture colonnaire native, fichiers ~5-10x plus
+        # petits et relecture bien plus rapide côté optimiseur
+        if output_format is None:
+            output_format = "parquet" if output_file.endswith(".parquet") else "csv"
+
+        if output_format == "parquet":
+            df.to_parquet(output_file, engine='pyarrow',
+                          compression='zstd', row_group_size=1024)
+        else:
+            # 3 décimales suffisent pour débits/coûts et allègent le CSV
+            df.to_csv(output_file, index=False, float_format='%.3f')
         print(f"  ✓ Fichier sauvegardé: {output_file}")
         
         # Statistiques
@@ -232,14 +237,15 @@ class AgriIrrigationDataGenerator:
         print(f"  - Dépassements: {df['power_exceeded'].sum()} occurrences")
         print(f"  - Fuites détectées: {df['leak_detected'].sum()} cas")
         
-        # Stats par pompe
+        # Stats par pompe (une seule passe groupby au lieu d'un masque par pompe)
         print(f"\n🔧 Par pompe:")
-        for pump_id in df['pump_id'].unique():
-            pump_data = df[df['pump_id'] == pump_id]
-            active_hours = (pump_data['status'] == 'ON').sum()
-            total_energy = pump_data['power_kw'].sum()
-            total_cost = pump_data['total_cost_fcfa'].sum()
-            print(f"  {pump_id}: {active_hours}h actif | {total_energy:,.0f} kWh | {total_cost:,.0f} FCFA")
+        per_pump = df.assign(active=(df['status'] == 'ON')).groupby('pump_id', observed=True).agg(
+            active_hours=('active', 'sum'),
+            total_energy=('power_kw', 'sum'),
+            total_cost=('total_cost_fcfa', 'sum')
+        )
+        for row in per_pump.itertuples():
+            print(f"  {row.Index}: {row.active_hours}h actif | {row.total_energy:,.0f} kWh | {row.total_cost:,.0f} FCFA")
         
         # Débit moyen par période
         hourly_avg = df.groupby('hour')['demand_m3h'].mean()
@@ -251,6 +257,40 @@ class AgriIrrigationDataGenerator:
         
         return df
     
+    def generate_dataset_streaming(self, output_file="data/pumping_data.csv", chunk_days=7):
+        """Génère le dataset par fenêtres de jours et écrit en flux
+
+        Même contenu que generate_dataset (CSV), mais la mémoire reste bornée
+        quelle que soit la durée simulée: chaque fenêtre de chunk_days jours
+        est générée (vectorisée) puis ajoutée au fichier avant la suivante.
+        Utile pour des horizons annuels ou des résolutions fines.
+        """
+        print("="*60)
+        print("AGRIWATER - GÉNÉRATION EN FLUX (CHUNKS)")
+        print("="*60)
+        print(f"  - Période: {self.days} jours par fenêtres de {chunk_days} jours")
+
+        os.makedirs(os.path.dirname(output_file) if os.path.dirname(output_file) else ".", exist_ok=True)
+
+        total_rows = 0
+        for i, first_day in enumerate(range(0, self.days, chunk_days)):
+            window_days = min(chunk_days, self.days - first_day)
+            window_start = self.start_date + pd.Timedelta(days=first_day)
+
+            timestamps, demand = self.generate_demand_pattern(
+                start_date=window_start, days=window_days)
+            df_chunk = self.generate_pump_data(timestamps, demand)
+
+            df_chunk.to_csv(output_file, mode='a' if i else 'w', header=(i == 0),
+                            index=False, float_format='%.3f')
+            total_rows += len(df_chunk)
+            print(f"  ✓ Fenêtre {i+1}: {window_days} jours ({len(df_chunk)} lignes)")
+
+        print(f"  ✓ {total_rows} enregistrements écrits: {output_file}")
+        print("="*60)
+
+        return total_rows
+
     def save_config(self, output_file="data/generator_config.json"):
         """Sauvegarde configuration pour reproductibilité"""
         
@@ -262,6 +302,7 @@ class AgriIrrigationDataGenerator:
             "tariff_offpeak": self.tariff_offpeak,
             "subscribed_power": self.subscribed_power,
             "penalty_rate": self.penalty_rate,
+            "seed": self.seed,
             "pump_configs": self.pump_configs
         }
         
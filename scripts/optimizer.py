@@ -8,24 +8,43 @@ Auteur: Abdoulaye Ouedraogo
 import pandas as pd
 import numpy as np
 from pulp import *
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timedelta
 import json
 import os
 
 class IrrigationScheduleOptimizer:
-    def __init__(self, demand_forecast, pump_configs, tariff_config):
+    def __init__(self, demand_forecast, pump_configs, tariff_config, solver='highs'):
         """
         Initialise optimiseur
-        
+
         Args:
             demand_forecast: Liste demandes horaires (m³/h)
             pump_configs: Liste configs pompes [{id, capacity_m3h, power_kw}, ...]
             tariff_config: Dict tarifs {peak, offpeak, subscribed_power, penalty_rate}
+            solver: 'highs' (moderne, rapide) ou 'cbc'; repli CBC si HiGHS absent
         """
         self.demand = demand_forecast
         self.pumps = pump_configs
         self.tariff = tariff_config
+        self.solver_name = solver
         self.solution = None
+        self._compiled = None
+
+    def _make_solver(self, time_limit=60, warm_start=False):
+        """Instancie le solveur MILP demandé, avec repli CBC"""
+        if self.solver_name == 'highs':
+            try:
+                # HiGHS: presolve moderne + dual simplex, nettement plus rapide
+                # que CBC sur les horizons longs; gap 1% accepté pour arrêt précoce
+                solver = HiGHS(msg=False, timeLimit=time_limit, gapRel=0.01,
+                               threads=os.cpu_count())
+                if solver.available():
+                    return solver
+            except Exception:
+                pass
+            print("  ⚠️  HiGHS indisponible, repli sur CBC")
+        return PULP_CBC_CMD(msg=1, timeLimit=time_limit, warmStart=warm_start)
         
     def build_optimization_problem(self, horizon_hours=24):
         """Construit problème d'optimisation MILP"""
@@ -37,84 +56,83 @@ class IrrigationScheduleOptimizer:
         
         # Créer problème
         prob = LpProblem("AgriWater_Irrigation_Scheduling", LpMinimize)
-        
-        # VARIABLES DE DÉCISION
-        
+
+        # Coefficients extraits une seule fois (évite les lookups dans les boucles)
+        pump_ids = [p['id'] for p in self.pumps]
+        capacity = {p['id']: p['capacity_m3h'] for p in self.pumps}
+        rated_power = {p['id']: p['power_kw'] for p in self.pumps}
+        hours = range(horizon_hours)
+        pump_hours = [(pid, t) for pid in pump_ids for t in hours]
+
+        # Tarif horaire précalculé une fois pour toutes (objectif + extraction)
+        self._tariff_arr = np.where(
+            (np.arange(horizon_hours) >= 7) & (np.arange(horizon_hours) < 23),
+            self.tariff['peak'], self.tariff['offpeak']
+        )
+        tariff_arr = self._tariff_arr
+
+        # VARIABLES DE DÉCISION (construction groupée via LpVariable.dicts)
+
         # pump_status[p, t] ∈ {0, 1} : pompe p active à l'heure t
-        pump_status = {}
-        for p in self.pumps:
-            for t in range(horizon_hours):
-                pump_status[(p['id'], t)] = LpVariable(
-                    f"pump_{p['id']}_h{t}", 
-                    cat='Binary'
-                )
-        
+        pump_status = LpVariable.dicts("pump", pump_hours, cat='Binary')
+
         # total_power[t] : puissance totale appelée à l'heure t
-        total_power = {}
-        for t in range(horizon_hours):
-            total_power[t] = LpVariable(f"total_power_h{t}", lowBound=0)
-        
+        total_power = LpVariable.dicts("total_power", hours, lowBound=0)
+
         # penalty[t] : pénalité de dépassement à l'heure t
-        penalty = {}
-        for t in range(horizon_hours):
-            penalty[t] = LpVariable(f"penalty_h{t}", lowBound=0)
-        
+        penalty = LpVariable.dicts("penalty", hours, lowBound=0)
+
         # startup[p, t] : indicateur démarrage pompe p à l'heure t
-        startup = {}
-        for p in self.pumps:
-            for t in range(horizon_hours):
-                startup[(p['id'], t)] = LpVariable(
-                    f"startup_{p['id']}_h{t}",
-                    cat='Binary'
-                )
-        
+        # Continu [0,1] et non binaire: la contrainte startup >= on[t]-on[t-1]
+        # plus le coût positif dans l'objectif rendent la relaxation intégrale
+        # (pump_status est binaire), donc même solution sans branchement inutile
+        startup = LpVariable.dicts("startup", pump_hours, lowBound=0, upBound=1)
+
         # FONCTION OBJECTIF: Minimiser coût total
-        
+
         objective = lpSum([
             # Coût énergie horaire
-            total_power[t] * (
-                self.tariff['peak'] if (7 <= t < 23) else self.tariff['offpeak']
-            )
+            total_power[t] * tariff_arr[t]
             # Pénalités dépassement
             + penalty[t]
             # Coût démarrages (usure équipements)
-            + lpSum([startup[(p['id'], t)] * 5000 for p in self.pumps])
-            
-            for t in range(horizon_hours)
+            + lpSum([startup[(pid, t)] * 5000 for pid in pump_ids])
+
+            for t in hours
         ])
-        
+
         prob += objective
-        
+
         print(f"  ✓ Fonction objectif définie")
-        
+
         # CONTRAINTES
-        
+
         constraint_count = 0
-        
+
         # 1. SATISFAIRE LA DEMANDE
-        for t in range(horizon_hours):
+        for t in hours:
             prob += (
                 lpSum([
-                    pump_status[(p['id'], t)] * p['capacity_m3h'] 
-                    for p in self.pumps
+                    pump_status[(pid, t)] * capacity[pid]
+                    for pid in pump_ids
                 ]) >= self.demand[t],
                 f"demand_satisfaction_h{t}"
             )
             constraint_count += 1
-        
+
         # 2. CALCUL PUISSANCE TOTALE
-        for t in range(horizon_hours):
+        for t in hours:
             prob += (
                 total_power[t] == lpSum([
-                    pump_status[(p['id'], t)] * p['power_kw'] 
-                    for p in self.pumps
+                    pump_status[(pid, t)] * rated_power[pid]
+                    for pid in pump_ids
                 ]),
                 f"total_power_calc_h{t}"
             )
             constraint_count += 1
-        
+
         # 3. CALCUL PÉNALITÉS (si dépassement puissance souscrite)
-        for t in range(horizon_hours):
+        for t in hours:
             prob += (
                 penalty[t] >= self.tariff['penalty_rate'] * (
                     total_power[t] - self.tariff['subscribed_power']
@@ -122,14 +140,14 @@ class IrrigationScheduleOptimizer:
                 f"penalty_calc_h{t}"
             )
             constraint_count += 1
-        
+
         # 4. DÉTECTION DÉMARRAGES
-        for p in self.pumps:
+        for pid in pump_ids:
             for t in range(1, horizon_hours):
                 # startup = 1 si pompe passe de OFF à ON
                 prob += (
-                    startup[(p['id'], t)] >= pump_status[(p['id'], t)] - pump_status[(p['id'], t-1)],
-                    f"startup_detect_{p['id']}_h{t}"
+                    startup[(pid, t)] >= pump_status[(pid, t)] - pump_status[(pid, t-1)],
+                    f"startup_detect_{pid}_h{t}"
                 )
                 constraint_count += 1
         
@@ -157,10 +175,10 @@ class IrrigationScheduleOptimizer:
         #     constraint_count += 1
         
         # 7. LIMITE DÉMARRAGES PAR POMPE (relâchée à 8/jour)
-        for p in self.pumps:
+        for pid in pump_ids:
             prob += (
-                lpSum([startup[(p['id'], t)] for t in range(min(24, horizon_hours))]) <= 8,
-                f"max_startups_{p['id']}"
+                lpSum([startup[(pid, t)] for t in range(min(24, horizon_hours))]) <= 8,
+                f"max_startups_{pid}"
             )
             constraint_count += 1
         
@@ -168,7 +186,44 @@ class IrrigationScheduleOptimizer:
         
         return prob, pump_status, total_power, penalty, startup
     
-    def optimize_schedule(self, horizon_hours=24):
+    def compile(self, horizon_hours=24):
+        """Pré-construit le problème MILP pour des ré-optimisations rapides
+
+        Le modèle (variables + contraintes statiques) ne dépend que du nombre
+        de pompes et de l'horizon; en horizon glissant seule la demande change
+        entre deux solves. On construit donc le problème une seule fois et
+        optimize_schedule ne met ensuite à jour que le second membre des
+        contraintes de demande avant de relancer le solveur.
+        """
+        prob, pump_status, total_power, penalty, startup = self.build_optimization_problem(horizon_hours)
+        self._compiled = {
+            'horizon': horizon_hours,
+            'prob': prob,
+            'pump_status': pump_status,
+            'total_power': total_power,
+            'penalty': penalty,
+            'startup': startup,
+        }
+        return self
+
+    def _set_warm_start(self, pump_status, horizon_hours):
+        """Initialise les variables depuis le planning baseline (faisable)
+
+        Reproduit l'activation séquentielle naive du générateur: la pompe p
+        tourne à l'heure t si la capacité cumulée des pompes précédentes ne
+        couvre pas la demande. Fournir ce point de départ au solveur réduit
+        l'arbre de branch-and-bound sur les ré-optimisations.
+        """
+        capacity = np.array([p['capacity_m3h'] for p in self.pumps], dtype=float)
+        served_before = np.concatenate(([0.0], np.cumsum(capacity)[:-1]))
+        demand_arr = np.asarray(self.demand[:horizon_hours], dtype=float)
+        baseline_on = demand_arr[:, None] > served_before[None, :]  # (H, P)
+
+        for i, p in enumerate(self.pumps):
+            for t in range(horizon_hours):
+                pump_status[(p['id'], t)].setInitialValue(int(baseline_on[t, i]))
+
+    def optimize_schedule(self, horizon_hours=24, warm_start=True):
         """Exécute optimisation"""
         
         print("\n" + "="*60)
@@ -180,14 +235,29 @@ class IrrigationScheduleOptimizer:
             print(f"⚠️  Avertissement: Demande sur {len(self.demand)}h seulement")
             horizon_hours = len(self.demand)
         
-        # Construire problème
-        prob, pump_status, total_power, penalty, startup = self.build_optimization_problem(horizon_hours)
-        
+        # Construire problème (ou réutiliser le modèle compilé en ne
+        # rafraîchissant que la demande)
+        if self._compiled is not None and self._compiled['horizon'] == horizon_hours:
+            prob = self._compiled['prob']
+            pump_status = self._compiled['pump_status']
+            total_power = self._compiled['total_power']
+            penalty = self._compiled['penalty']
+            startup = self._compiled['startup']
+            for t in range(horizon_hours):
+                prob.constraints[f"demand_satisfaction_h{t}"].changeRHS(self.demand[t])
+            print(f"\n🔧 Modèle compilé réutilisé ({horizon_hours}h)")
+        else:
+            prob, pump_status, total_power, penalty, startup = self.build_optimization_problem(horizon_hours)
+
+        # Warm start depuis le planning baseline (ignoré par HiGHS via pulp)
+        if warm_start:
+            self._set_warm_start(pump_status, horizon_hours)
+
         # Résoudre
         print(f"\n🚀 Lancement solveur MILP...")
         start_time = datetime.now()
-        
-        solver = PULP_CBC_CMD(msg=1, timeLimit=60)  # Max 60s
+
+        solver = self._make_solver(time_limit=60, warm_start=warm_start)  # Max 60s
         prob.solve(solver)
         
         solve_time = (datetime.now() - start_time).total_seconds()
@@ -205,49 +275,45 @@ class IrrigationScheduleOptimizer:
                 print("  → Problème non borné")
             return None
         
-        # Extraction solution
-        schedule = []
-        total_cost_optimized = 0
-        total_energy = 0
-        total_penalties = 0
-        
-        for t in range(horizon_hours):
-            hour_data = {
-                'hour': t,
-                'demand_m3h': self.demand[t],
-                'total_power_kw': total_power[t].varValue,
-                'penalty_fcfa': penalty[t].varValue if penalty[t].varValue else 0,
-                'tariff_fcfa_kwh': self.tariff['peak'] if (7 <= t < 23) else self.tariff['offpeak'],
-                'pumps_active': [],
-                'pumps_status': {}
-            }
-            
-            # État pompes
-            for p in self.pumps:
-                status_val = pump_status[(p['id'], t)].varValue
-                hour_data['pumps_status'][p['id']] = 'ON' if status_val > 0.5 else 'OFF'
-                if status_val > 0.5:
-                    hour_data['pumps_active'].append(p['id'])
-            
-            # Calcul coût heure
-            energy_cost = hour_data['total_power_kw'] * hour_data['tariff_fcfa_kwh']
-            hour_data['energy_cost_fcfa'] = energy_cost
-            hour_data['total_cost_fcfa'] = energy_cost + hour_data['penalty_fcfa']
-            
-            total_cost_optimized += hour_data['total_cost_fcfa']
-            total_energy += hour_data['total_power_kw']
-            total_penalties += hour_data['penalty_fcfa']
-            
-            schedule.append(hour_data)
-        
+        # Extraction solution - matrice booléenne d'activation puis colonnes
+        # plates typées (une colonne int8 par pompe, pas de dict/list object)
+        pump_ids = [p['id'] for p in self.pumps]
+        on_matrix = np.zeros((horizon_hours, len(pump_ids)), dtype=bool)
+        for i, pid in enumerate(pump_ids):
+            for t in range(horizon_hours):
+                on_matrix[t, i] = pump_status[(pid, t)].varValue > 0.5
+
+        total_power_arr = np.array([total_power[t].varValue for t in range(horizon_hours)])
+        penalty_arr = np.array([penalty[t].varValue or 0 for t in range(horizon_hours)])
+        energy_cost_arr = total_power_arr * self._tariff_arr
+        total_cost_arr = energy_cost_arr + penalty_arr
+
+        schedule_df = pd.DataFrame({
+            'hour': np.arange(horizon_hours),
+            'demand_m3h': np.asarray(self.demand[:horizon_hours]),
+            'total_power_kw': total_power_arr,
+            'penalty_fcfa': penalty_arr,
+            'tariff_fcfa_kwh': self._tariff_arr,
+            'energy_cost_fcfa': energy_cost_arr,
+            'total_cost_fcfa': total_cost_arr,
+            # Liste lisible conservée pour affichage/compat visualisation
+            'pumps_active': [[pid for pid, on in zip(pump_ids, row) if on]
+                             for row in on_matrix],
+        })
+        for i, pid in enumerate(pump_ids):
+            schedule_df[f'pump_{pid}'] = on_matrix[:, i].astype(np.int8)
+
         self.solution = {
-            'schedule': pd.DataFrame(schedule),
-            'total_cost': total_cost_optimized,
-            'total_energy': total_energy,
-            'total_penalties': total_penalties,
+            'schedule': schedule_df,
+            'total_cost': total_cost_arr.sum(),
+            'total_energy': total_power_arr.sum(),
+            'total_penalties': penalty_arr.sum(),
             'status': status,
             'solve_time': solve_time
         }
+        total_cost_optimized = self.solution['total_cost']
+        total_energy = self.solution['total_energy']
+        total_penalties = self.solution['total_penalties']
         
         print(f"\n💰 Coût optimisé: {total_cost_optimized:,.0f} FCFA")
         print(f"  - Énergie: {total_energy:,.1f} kWh")
@@ -328,6 +394,47 @@ class IrrigationScheduleOptimizer:
         }
 
 
+def _solve_scenario(scenario):
+    """Résout un scénario indépendant (exécuté dans un processus worker)"""
+    optimizer = IrrigationScheduleOptimizer(
+        scenario['demand'],
+        scenario['pump_configs'],
+        scenario['tariff_config'],
+        solver=scenario.get('solver', 'highs')
+    )
+    solution = optimizer.optimize_schedule(
+        horizon_hours=scenario.get('horizon_hours', 24)
+    )
+    return scenario.get('name'), solution
+
+
+def run_scenario_sweep(scenarios, max_workers=None):
+    """Optimise plusieurs scénarios (jours, saisons, tarifs) en parallèle
+
+    Les résolutions MILP sont indépendantes entre elles: on les distribue
+    sur des processus workers (un solve par worker), ce qui donne un
+    speedup quasi linéaire jusqu'au nombre de coeurs.
+
+    Args:
+        scenarios: Liste de dicts {name, demand, pump_configs, tariff_config,
+                   horizon_hours?, solver?}
+        max_workers: Nombre de processus (défaut: nombre de coeurs)
+
+    Returns:
+        Dict {name: solution} dans l'ordre d'entrée
+    """
+    max_workers = max_workers or os.cpu_count()
+
+    print(f"\n🔀 Optimisation de {len(scenarios)} scénarios sur {max_workers} workers...")
+
+    results = {}
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        for name, solution in pool.map(_solve_scenario, scenarios):
+            results[name] = solution
+
+    return results
+
+
 def run_optimization_demo():
     """Fonction démo complète"""
     
@@ -335,20 +442,36 @@ def run_optimization_demo():
     print(" "*15 + "AGRIWATER OPTIMIZER - DEMO")
     print("="*70)
     
-    # Charger données baseline
+    # Charger données baseline (Parquet prioritaire si disponible)
     print("\n📂 Chargement données baseline...")
+    data_file = "data/irrigation_data.parquet"
+    if not os.path.exists(data_file):
+        data_file = "data/irrigation_data.csv"
     try:
-        baseline_df = pd.read_csv("data/irrigation_data.csv")
-        baseline_df['timestamp'] = pd.to_datetime(baseline_df['timestamp'])
-        print(f"  ✓ {len(baseline_df)} enregistrements chargés")
+        if data_file.endswith(".parquet"):
+            baseline_df = pd.read_parquet(data_file)
+        else:
+            try:
+                # Parseur CSV Arrow: multithreadé, parse le timestamp au vol
+                baseline_df = pd.read_csv(data_file, engine='pyarrow',
+                                          parse_dates=['timestamp'])
+            except ImportError:
+                baseline_df = pd.read_csv(data_file)
+                baseline_df['timestamp'] = pd.to_datetime(baseline_df['timestamp'])
+        print(f"  ✓ {len(baseline_df)} enregistrements chargés ({data_file})")
     except FileNotFoundError:
-        print("  ❌ Fichier data/irrigation_data.csv introuvable!")
+        print(f"  ❌ Fichier {data_file} introuvable!")
         print("  → Exécutez d'abord: python data_generator.py")
         return
     
-    # Extraire demande pour optimisation (24h)
+    # Extraire demande pour optimisation (24h) - on reste en numpy, pas de
+    # liste Python intermédiaire
     horizon = 24
-    demand_hourly = baseline_df.groupby('hour')['demand_m3h'].mean().tolist()[:horizon]
+    demand_hourly = (
+        baseline_df.groupby('hour', sort=True, observed=True)['demand_m3h']
+        .mean()
+        .to_numpy()[:horizon]
+    )
     
     # Configuration pompes
     pump_configs = [
@@ -5,32 +5,239 @@ Génère graphiques professionnels pour démonstration
 Auteur: Abdoulaye Ouedraogo
 """
 
+import ast
 import pandas as pd
+import matplotlib
+matplotlib.use('Agg')  # le script ne fait que du savefig: inutile d'initialiser un backend GUI
 import matplotlib.pyplot as plt
+from matplotlib.collections import LineCollection, PolyCollection
+from matplotlib.colors import ListedColormap
+from matplotlib.font_manager import FontProperties
+from matplotlib.lines import Line2D
+from matplotlib.patches import Patch
 import seaborn as sns
 import numpy as np
+import hashlib
 import json
 import os
+from concurrent.futures import ProcessPoolExecutor
+
+
+# Gabarit du rapport texte: construit une fois à l'import, les lignes de
+# séparation sont figées et seuls les trous {…} sont remplis à l'exécution.
+REPORT_TEMPLATE = f"""
+{'='*70}
+                RAPPORT D'OPTIMISATION IRRIGATION
+                        AGRIWATER OPTIMIZER
+{'='*70}
+
+📊 RÉSULTATS FINANCIERS
+{'-'*70}
+
+Coût Baseline (non optimisé):      {{baseline_cost}} FCFA
+Coût Optimisé:                      {{optimized_cost}} FCFA
+                                    {'-'*15}
+ÉCONOMIES RÉALISÉES:                {{savings}} FCFA
+Pourcentage de réduction:           {{savings_percent}} %
+
+
+💰 PROJECTIONS
+{'-'*70}
+
+Économies mensuelles estimées:      {{monthly_projection}} FCFA
+Économies annuelles estimées:       {{annual_projection}} FCFA
+
+
+⚡ PERFORMANCE TECHNIQUE
+{'-'*70}
+
+Temps de résolution:                {{solve_time}} secondes
+Méthode d'optimisation:             MILP (Mixed-Integer Linear Programming)
+Solveur utilisé:                    CBC (COIN-OR Branch and Cut)
+
+
+✅ CONCLUSION
+{'-'*70}
+
+L'optimisation mathématique du planning d'irrigation permet de réduire
+significativement les coûts opérationnels de la ferme en:
+
+1. Minimisant les pénalités de dépassement de puissance souscrite
+2. Profitant des tarifs heures creuses pour irrigation nocturne
+3. Limitant l'usure des équipements (démarrages optimisés)
+4. Maintenant l'approvisionnement en eau des cultures
+5. Intégrant la production solaire en journée
+
+ROI estimé du système: < 4 mois
+
+{'='*70}
+
+Généré par: AgriWater Optimizer
+Auteur: Abdoulaye Ouedraogo
+Date: {{date}}
+"""
+
+
+def _lttb_downsample(x, y, n_out):
+    """Sous-échantillonne (x, y) par Largest-Triangle-Three-Buckets
+
+    Garde le point de chaque bucket qui maximise l'aire du triangle formé
+    avec le dernier point retenu et la moyenne du bucket suivant: préserve
+    les pics visuels bien mieux qu'une décimation naïve.
+    """
+    n = len(x)
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    if n_out >= n or n_out < 3:
+        return x, y
+
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.intp)
+    idx = np.empty(n_out, dtype=np.intp)
+    idx[0], idx[-1] = 0, n - 1
+
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], max(edges[i + 1], edges[i] + 1)
+        if i + 2 < len(edges):
+            next_x = x[edges[i + 1]:edges[i + 2]].mean()
+            next_y = y[edges[i + 1]:edges[i + 2]].mean()
+        else:
+            next_x, next_y = x[-1], y[-1]
+
+        area = np.abs((x[a] - next_x) * (y[lo:hi] - y[a])
+                      - (x[a] - x[lo:hi]) * (next_y - y[a]))
+        a = lo + area.argmax()
+        idx[i + 1] = a
+
+    return x[idx], y[idx]
+
+
+def _maybe_downsample(x, y, max_points=4000):
+    """Applique LTTB si la série dépasse max_points (sinon inchangée)"""
+    if len(x) > max_points:
+        return _lttb_downsample(x, y, max_points)
+    return np.asarray(x), np.asarray(y)
+
+
+def _bars_batched(ax, centers, heights, width, facecolors, label=None,
+                  alpha=0.8, linewidths=0.5):
+    """Dessine une série de barres en un seul artiste PolyCollection
+
+    Un PolyCollection portant les sommets de toutes les barres remplace les
+    N patches Rectangle créés par ax.bar; retourne une poignée proxy pour
+    la légende.
+    """
+    centers = np.asarray(centers, dtype=float)
+    heights = np.asarray(heights, dtype=float)
+    left, right = centers - width / 2, centers + width / 2
+    zeros = np.zeros_like(heights)
+
+    verts = np.stack([
+        np.stack([left, zeros], axis=1),
+        np.stack([right, zeros], axis=1),
+        np.stack([right, heights], axis=1),
+        np.stack([left, heights], axis=1),
+    ], axis=1)  # (N barres, 4 sommets, 2)
+
+    ax.add_collection(PolyCollection(verts, facecolors=facecolors,
+                                     edgecolors='black', linewidths=linewidths,
+                                     alpha=alpha))
+    ax.autoscale_view()
+
+    return Patch(facecolor=facecolors if isinstance(facecolors, str) else facecolors[0],
+                 edgecolor='black', alpha=alpha, label=label)
+
+
+def _plot_lines_batched(ax, x, series, colors, labels, linewidths=2.5, alpha=0.8):
+    """Trace plusieurs courbes en un seul artiste LineCollection
+
+    Un LineCollection unique remplace N Line2D (une passe de transform/draw
+    au lieu de N); les marqueurs sont ajoutés via un seul scatter et la
+    légende via des poignées proxy. Les horizons longs sont d'abord
+    sous-échantillonnés (LTTB) pour borner le nombre de points tracés.
+    """
+    x = np.asarray(x)
+    xs, ys = [], []
+    for y in series:
+        sx, sy = _maybe_downsample(x, np.asarray(y))
+        xs.append(sx)
+        ys.append(sy)
+
+    segments = [np.column_stack([sx, sy]) for sx, sy in zip(xs, ys)]
+    ax.add_collection(LineCollection(segments, colors=colors,
+                                     linewidths=linewidths, alpha=alpha))
+
+    ax.scatter(np.concatenate(xs), np.concatenate(ys),
+               c=np.repeat(colors, [len(sx) for sx in xs]), s=36, alpha=alpha)
+    ax.autoscale_view()
+
+    return [Line2D([0], [0], color=c, linewidth=linewidths, marker='o', label=l)
+            for c, l in zip(colors, labels)]
 
 # Configuration style
 plt.style.use('seaborn-v0_8-darkgrid')
 sns.set_palette("husl")
 
-def load_data():
-    """Charge données baseline et optimisées"""
-    
+def _read_csv_cached(csv_path, usecols=None, dtype=None):
+    """Lit un CSV en passant par un cache Parquet à côté du fichier
+
+    Au premier chargement le DataFrame est réécrit en Parquet (zstd); les
+    exécutions suivantes relisent le cache tant que le CSV n'a pas changé
+    (comparaison des mtimes), ce qui évite de re-parser le texte à chaque
+    itération sur les graphiques.
+
+    Args:
+        usecols: Colonnes à charger (le cache ne contient que celles-là)
+        dtype: Types explicites passés au parseur CSV (pas d'inférence)
+    """
+    cache_path = os.path.splitext(csv_path)[0] + '.parquet'
+    try:
+        if os.path.getmtime(cache_path) > os.path.getmtime(csv_path):
+            return pd.read_parquet(cache_path)
+    except (OSError, ImportError):
+        pass  # cache absent ou pyarrow indisponible: on repart du CSV
+
+    df = pd.read_csv(csv_path, usecols=usecols, dtype=dtype)
+    try:
+        df.to_parquet(cache_path, compression='zstd')
+    except ImportError:
+        pass  # pas de moteur Parquet installé: on reste en CSV pur
+    return df
+
+
+def load_data(parse_timestamps=False):
+    """Charge données baseline et optimisées
+
+    Args:
+        parse_timestamps: Convertir la colonne timestamp en datetime (inutile
+            pour les graphiques actuels qui n'agrègent que par heure)
+    """
+
     print("\n📂 Chargement données pour visualisation...")
-    
+
     try:
-        baseline_df = pd.read_csv("data/irrigation_data.csv")
-        baseline_df['timestamp'] = pd.to_datetime(baseline_df['timestamp'])
+        # Seules ces colonnes servent aux graphiques; les types explicites
+        # évitent la passe d'inférence du parseur et divisent la mémoire
+        baseline_df = _read_csv_cached(
+            "data/irrigation_data.csv",
+            usecols=['timestamp', 'hour', 'total_cost_fcfa', 'power_kw',
+                     'penalty_fcfa', 'energy_cost_fcfa', 'flow_m3h'],
+            dtype={'hour': 'int16', 'total_cost_fcfa': 'float32',
+                   'power_kw': 'float32', 'penalty_fcfa': 'float32',
+                   'energy_cost_fcfa': 'float32', 'flow_m3h': 'float32'})
+        if parse_timestamps:
+            baseline_df['timestamp'] = pd.to_datetime(baseline_df['timestamp'])
+        # 'hour' en catégorie ordonnée 0..23: les groupby horaires passent par
+        # le chemin catégoriel indexé (pas de re-hachage de la colonne)
+        baseline_df['hour'] = pd.Categorical(baseline_df['hour'],
+                                             categories=range(24), ordered=True)
         print(f"  ✓ Baseline: {len(baseline_df)} enregistrements")
     except FileNotFoundError:
         print("  ❌ Fichier baseline introuvable!")
         return None, None, None
     
     try:
-        optimized_df = pd.read_csv("results/optimized_schedule.csv")
+        optimized_df = _read_csv_cached("results/optimized_schedule.csv")
         print(f"  ✓ Optimisé: {len(optimized_df)} enregistrements")
     except FileNotFoundError:
         print("  ❌ Fichier optimisé introuvable!")
@@ -48,44 +255,80 @@ def load_data():
     return baseline_df, optimized_df, metrics
 
 
-def plot_cost_comparison(baseline_df, optimized_df, metrics, save_path="results/cost_comparison.png"):
-    """Graphique comparaison coûts horaires"""
-    
-    fig, axes = plt.subplots(2, 2, figsize=(16, 10))
-    fig.suptitle('AgriWater: Analyse Comparative Optimisation Irrigation', 
-                 fontsize=16, fontweight='bold', y=0.995)
-    
-    # Préparer données
-    horizon = len(optimized_df)
-    baseline_hourly = baseline_df.groupby('hour').agg({
+def aggregate_baseline_hourly(baseline_df):
+    """Agrège les coûts/puissances/débits baseline par heure de la journée
+
+    Calculé une seule fois dans main() et partagé entre les graphiques:
+    une unique passe de groupby au lieu d'une par fonction de tracé.
+    """
+    return baseline_df.groupby('hour').agg({
         'total_cost_fcfa': 'sum',
         'power_kw': 'sum',
         'penalty_fcfa': 'sum',
-        'energy_cost_fcfa': 'sum'
-    }).head(horizon)
-    
+        'energy_cost_fcfa': 'sum',
+        'flow_m3h': 'sum'
+    })
+
+
+def plot_cost_comparison(baseline_df, optimized_df, metrics, save_path="results/cost_comparison.png",
+                         fig=None, baseline_hourly=None):
+    """Graphique comparaison coûts horaires
+
+    Args:
+        fig: Figure existante à réutiliser (vidée puis redessinée); sinon
+            une nouvelle figure est créée
+        baseline_hourly: Agrégat horaire pré-calculé (voir
+            aggregate_baseline_hourly); recalculé ici si absent
+    """
+
+    if fig is None:
+        fig, axes = plt.subplots(2, 2, figsize=(16, 10), layout='constrained')
+    else:
+        fig.clear()
+        fig.set_layout_engine('constrained')
+        axes = fig.subplots(2, 2)
+    fig.suptitle('AgriWater: Analyse Comparative Optimisation Irrigation',
+                 fontsize=16, fontweight='bold')
+
+    # Préparer données
+    horizon = len(optimized_df)
+    if baseline_hourly is None:
+        baseline_hourly = aggregate_baseline_hourly(baseline_df)
+    baseline_hourly = baseline_hourly.head(horizon)
+
     hours = range(horizon)
-    
+
+    # Toutes les séries converties en ndarray une seule fois en tête de
+    # fonction: plus aucun __getitem__/décision vue-ou-copie dans les tracés
+    baseline_costs = baseline_hourly['total_cost_fcfa'].to_numpy()
+    baseline_energy = baseline_hourly['power_kw'].to_numpy()
+    baseline_penalties = baseline_hourly['penalty_fcfa'].to_numpy()
+    optimized_costs = optimized_df['total_cost_fcfa'].to_numpy()
+    optimized_energy = optimized_df['total_power_kw'].to_numpy()
+    optimized_penalties = optimized_df['penalty_fcfa'].to_numpy()
+
     # 1. COÛTS HORAIRES TOTAUX
     ax1 = axes[0, 0]
-    
+
     width = 0.35
     x = np.arange(len(hours))
-    
-    baseline_costs = baseline_hourly['total_cost_fcfa'].values
-    optimized_costs = optimized_df['total_cost_fcfa'].values
-    
-    bars1 = ax1.bar(x - width/2, baseline_costs, width, label='Baseline', 
-                    color='#e74c3c', alpha=0.8, edgecolor='black', linewidth=0.5)
-    bars2 = ax1.bar(x + width/2, optimized_costs, width, label='Optimisé', 
-                    color='#27ae60', alpha=0.8, edgecolor='black', linewidth=0.5)
-    
+    # Étiquettes calculées une seule fois et partagées par les trois axes horaires
+    hour_labels = [f'{h}h' for h in hours]
+
+
+    cost_handles = [
+        _bars_batched(ax1, x - width/2, baseline_costs, width,
+                      facecolors='#e74c3c', label='Baseline'),
+        _bars_batched(ax1, x + width/2, optimized_costs, width,
+                      facecolors='#27ae60', label='Optimisé'),
+    ]
+
     ax1.set_xlabel('Heure de la journée', fontsize=11, fontweight='bold')
     ax1.set_ylabel('Coût total (FCFA)', fontsize=11, fontweight='bold')
     ax1.set_title('Coûts Horaires Totaux (Énergie + Pénalités)', fontsize=12, fontweight='bold')
     ax1.set_xticks(x)
-    ax1.set_xticklabels([f'{h}h' for h in hours], rotation=45, ha='right')
-    ax1.legend(loc='upper left', fontsize=10)
+    ax1.set_xticklabels(hour_labels, rotation=45, ha='right')
+    ax1.legend(handles=cost_handles, loc='upper left', fontsize=10)
     ax1.grid(True, alpha=0.3, axis='y')
     
     # Annotations zones tarifaires
@@ -96,35 +339,29 @@ def plot_cost_comparison(baseline_df, optimized_df, metrics, save_path="results/
     
     # 2. CONSOMMATION ÉNERGÉTIQUE
     ax2 = axes[0, 1]
-    
-    baseline_energy = baseline_hourly['power_kw'].values
-    optimized_energy = optimized_df['total_power_kw'].values
-    
-    ax2.plot(hours, baseline_energy, 'o-', label='Baseline', 
-             color='#e74c3c', linewidth=2.5, markersize=6, alpha=0.8)
-    ax2.plot(hours, optimized_energy, 's-', label='Optimisé', 
-             color='#27ae60', linewidth=2.5, markersize=6, alpha=0.8)
-    
+
+    energy_handles = _plot_lines_batched(
+        ax2, hours, [baseline_energy, optimized_energy],
+        colors=['#e74c3c', '#27ae60'], labels=['Baseline', 'Optimisé'])
+
     # Ligne puissance souscrite
     if metrics and 'baseline_cost_fcfa' in metrics:
         subscribed_power = 150  # kW (valeur par défaut)
-        ax2.axhline(y=subscribed_power, color='red', linestyle='--', 
-                    linewidth=2, label=f'Puissance souscrite ({subscribed_power} kW)', alpha=0.7)
-    
+        energy_handles.append(
+            ax2.axhline(y=subscribed_power, color='red', linestyle='--',
+                        linewidth=2, label=f'Puissance souscrite ({subscribed_power} kW)', alpha=0.7))
+
     ax2.set_xlabel('Heure de la journée', fontsize=11, fontweight='bold')
     ax2.set_ylabel('Puissance (kW)', fontsize=11, fontweight='bold')
     ax2.set_title('Consommation Énergétique Horaire', fontsize=12, fontweight='bold')
-    ax2.legend(loc='upper left', fontsize=10)
+    ax2.legend(handles=energy_handles, loc='upper left', fontsize=10)
     ax2.grid(True, alpha=0.3)
     ax2.set_xticks(hours)
-    ax2.set_xticklabels([f'{h}h' for h in hours], rotation=45, ha='right')
+    ax2.set_xticklabels(hour_labels, rotation=45, ha='right')
     
     # 3. PÉNALITÉS
     ax3 = axes[1, 0]
-    
-    baseline_penalties = baseline_hourly['penalty_fcfa'].values
-    optimized_penalties = optimized_df['penalty_fcfa'].values
-    
+
     ax3.fill_between(hours, baseline_penalties, alpha=0.5, label='Baseline', 
                      color='#e74c3c', step='mid')
     ax3.fill_between(hours, optimized_penalties, alpha=0.5, label='Optimisé', 
@@ -136,7 +373,7 @@ def plot_cost_comparison(baseline_df, optimized_df, metrics, save_path="results/
     ax3.legend(loc='upper left', fontsize=10)
     ax3.grid(True, alpha=0.3)
     ax3.set_xticks(hours)
-    ax3.set_xticklabels([f'{h}h' for h in hours], rotation=45, ha='right')
+    ax3.set_xticklabels(hour_labels, rotation=45, ha='right')
     
     # 4. RÉCAPITULATIF ÉCONOMIES
     ax4 = axes[1, 1]
@@ -150,77 +387,104 @@ def plot_cost_comparison(baseline_df, optimized_df, metrics, save_path="results/
         ]
         colors = ['#e74c3c', '#27ae60', '#3498db']
         
-        bars = ax4.bar(categories, values, color=colors, alpha=0.8, 
-                       edgecolor='black', linewidth=1.5)
-        
+        x_metrics = np.arange(len(categories))
+        _bars_batched(ax4, x_metrics, values, 0.8, facecolors=colors,
+                      linewidths=1.5)
+        ax4.set_xticks(x_metrics)
+        ax4.set_xticklabels(categories)
+
         ax4.set_ylabel('Montant (FCFA)', fontsize=11, fontweight='bold')
         ax4.set_title(f"Impact Financier Global\nÉconomies: {metrics['savings_percent']:.1f}% | " +
                      f"Projection mensuelle: {metrics['monthly_projection_fcfa']:,.0f} FCFA",
                      fontsize=12, fontweight='bold')
-        
-        # Annotations sur barres
-        for bar in bars:
-            height = bar.get_height()
-            ax4.text(bar.get_x() + bar.get_width()/2., height,
-                    f'{height:,.0f}\nFCFA',
-                    ha='center', va='bottom', fontweight='bold', fontsize=10)
+
+        # Annotations sur barres: propriétés de police résolues une seule
+        # fois, pas de recherche de famille de police par annotation
+        annotation_font = FontProperties(weight='bold', size=10)
+        for xi, value in zip(x_metrics, values):
+            ax4.text(xi, value,
+                    f'{value:,.0f}\nFCFA',
+                    ha='center', va='bottom', fontproperties=annotation_font)
         
         ax4.grid(True, alpha=0.3, axis='y')
     else:
-        ax4.text(0.5, 0.5, 'Métriques non disponibles', 
+        ax4.text(0.5, 0.5, 'Métriques non disponibles',
                 ha='center', va='center', transform=ax4.transAxes, fontsize=14)
-    
-    plt.tight_layout()
-    
+
     # Sauvegarder
     os.makedirs(os.path.dirname(save_path), exist_ok=True)
-    plt.savefig(save_path, dpi=300, bbox_inches='tight')
+    fig.savefig(save_path, dpi=150, bbox_inches='tight',
+                pil_kwargs={'optimize': True, 'compress_level': 3})
     print(f"\n✅ Graphique sauvegardé: {save_path}")
     
     return fig
 
 
-def plot_pump_schedule(optimized_df, save_path="results/pump_schedule.png"):
-    """Graphique planning d'activation des pompes"""
-    
-    fig, ax = plt.subplots(figsize=(14, 6))
+def plot_pump_schedule(optimized_df, save_path="results/pump_schedule.png", fig=None):
+    """Graphique planning d'activation des pompes
+
+    Args:
+        fig: Figure existante à réutiliser (vidée puis redessinée)
+    """
+
+    if fig is None:
+        fig, ax = plt.subplots(figsize=(14, 6))
+    else:
+        fig.clear()
+        fig.set_layout_engine('tight')
+        ax = fig.subplots()
     
     # Extraire statuts pompes
-    hours = optimized_df['hour'].values
+    hours = optimized_df['hour'].to_numpy()
     
     # Récupérer IDs pompes (assume P1, P2, P3)
     pump_ids = ['P1', 'P2', 'P3']
     
-    # Créer données pour heatmap
-    schedule_matrix = []
-    for pump_id in pump_ids:
-        pump_status = []
-        for _, row in optimized_df.iterrows():
-            # Vérifier si pompe active (dans pumps_active si colonne existe)
-            if 'pumps_active' in row and isinstance(row['pumps_active'], str):
-                active = pump_id in row['pumps_active']
+    # Chemin rapide: l'optimiseur écrit désormais des colonnes binaires
+    # pump_P1/pump_P2/pump_P3 — la matrice se lit directement, zéro parsing
+    if all(f'pump_{p}' in optimized_df.columns for p in pump_ids):
+        schedule_matrix = (optimized_df[[f'pump_{p}' for p in pump_ids]]
+                           .to_numpy(dtype=np.int8).T)
+    else:
+        # Anciens plannings: décodage vectorisé de la colonne pumps_active
+        # (un test de sous-chaîne C sur toute la colonne par pompe). La garde
+        # de type se fait une fois au niveau colonne (fillna + astype),
+        # jamais valeur par valeur dans une boucle Python.
+        pumps_active = (optimized_df['pumps_active'].fillna('').astype(str)
+                        if 'pumps_active' in optimized_df.columns else None)
+
+        schedule_matrix = []
+        for pump_id in pump_ids:
+            if pumps_active is not None:
+                mask = pumps_active.str.contains(pump_id, regex=False).to_numpy(dtype=np.int8)
             elif f'pump_status_{pump_id}' in optimized_df.columns:
-                active = row[f'pump_status_{pump_id}'] == 'ON'
+                mask = (optimized_df[f'pump_status_{pump_id}'] == 'ON').to_numpy(dtype=np.int8)
             else:
-                # Fallback: parser pumps_status si disponible
-                active = False
-            
-            pump_status.append(1 if active else 0)
-        schedule_matrix.append(pump_status)
-    
-    # Créer heatmap
-    sns.heatmap(schedule_matrix, 
-                cmap=['white', '#27ae60'], 
-                cbar_kws={'label': 'État', 'ticks': [0.25, 0.75], 
-                         'orientation': 'horizontal'},
-                linewidths=1, linecolor='black',
-                yticklabels=pump_ids,
-                xticklabels=[f'{h}h' for h in hours],
-                ax=ax,
-                vmin=0, vmax=1)
-    
+                mask = np.zeros(len(optimized_df), dtype=np.int8)
+            schedule_matrix.append(mask)
+        schedule_matrix = np.vstack(schedule_matrix)
+    
+    # Créer la grille binaire avec imshow: un seul artiste image au lieu du
+    # QuadMesh + heuristiques d'annotation de sns.heatmap
+    im = ax.imshow(schedule_matrix, aspect='auto',
+                   cmap=ListedColormap(['white', '#27ae60']),
+                   interpolation='nearest', vmin=0, vmax=1)
+
+    ax.set_xticks(np.arange(len(hours)))
+    ax.set_xticklabels([f'{h}h' for h in hours])
+    ax.set_yticks(np.arange(len(pump_ids)))
+    ax.set_yticklabels(pump_ids)
+
+    # Quadrillage noir entre cellules (équivalent linewidths du heatmap)
+    ax.grid(False)
+    ax.set_xticks(np.arange(-0.5, len(hours)), minor=True)
+    ax.set_yticks(np.arange(-0.5, len(pump_ids)), minor=True)
+    ax.grid(which='minor', color='black', linewidth=1)
+    ax.tick_params(which='minor', length=0)
+
     # Personnaliser colorbar
-    cbar = ax.collections[0].colorbar
+    cbar = fig.colorbar(im, ax=ax, ticks=[0.25, 0.75],
+                        orientation='horizontal', label='État')
     cbar.set_ticklabels(['OFF', 'ON'])
     
     ax.set_title('Planning Optimisé d\'Activation des Pompes (24h)', 
@@ -229,61 +493,76 @@ def plot_pump_schedule(optimized_df, save_path="results/pump_schedule.png"):
     ax.set_ylabel('Pompe', fontsize=12, fontweight='bold')
     
     plt.xticks(rotation=45, ha='right')
-    plt.tight_layout()
+    fig.tight_layout()
     
     os.makedirs(os.path.dirname(save_path), exist_ok=True)
-    plt.savefig(save_path, dpi=300, bbox_inches='tight')
+    fig.savefig(save_path, dpi=150, bbox_inches='tight',
+                pil_kwargs={'optimize': True, 'compress_level': 3})
     print(f"✅ Planning pompes sauvegardé: {save_path}")
     
     return fig
 
 
-def plot_demand_vs_supply(baseline_df, optimized_df, save_path="results/demand_supply.png"):
-    """Graphique demande vs capacité de pompage"""
-    
-    fig, ax = plt.subplots(figsize=(14, 6))
-    
-    hours = optimized_df['hour'].values
-    demand = optimized_df['demand_m3h'].values
-    
+def plot_demand_vs_supply(baseline_df, optimized_df, save_path="results/demand_supply.png",
+                          fig=None, baseline_hourly=None):
+    """Graphique demande vs capacité de pompage
+
+    Args:
+        fig: Figure existante à réutiliser (vidée puis redessinée)
+        baseline_hourly: Agrégat horaire pré-calculé (voir
+            aggregate_baseline_hourly); recalculé ici si absent
+    """
+
+    if fig is None:
+        fig, ax = plt.subplots(figsize=(14, 6))
+    else:
+        fig.clear()
+        fig.set_layout_engine('tight')
+        ax = fig.subplots()
+
+    hours = optimized_df['hour'].to_numpy()
+    demand = optimized_df['demand_m3h'].to_numpy()
+
     # Capacité baseline (somme flow de toutes pompes actives)
-    baseline_hourly = baseline_df.groupby('hour')['flow_m3h'].sum().head(len(hours))
+    if baseline_hourly is None:
+        baseline_hourly = aggregate_baseline_hourly(baseline_df)
+    baseline_flow = baseline_hourly['flow_m3h'].head(len(hours))
     
     # Capacité optimisée (calculer à partir des pompes actives)
     # Assume 60+50+55 = 165 m³/h capacité totale si toutes ON
     pump_capacities = {'P1': 60, 'P2': 50, 'P3': 55}
     
-    optimized_supply = []
-    for _, row in optimized_df.iterrows():
-        total_capacity = 0
-        if 'pumps_active' in row and isinstance(row['pumps_active'], str):
-            active_pumps = eval(row['pumps_active']) if row['pumps_active'].startswith('[') else []
-            for pump in active_pumps:
-                total_capacity += pump_capacities.get(pump, 0)
-        optimized_supply.append(total_capacity)
-    
-    # Tracer
-    ax.plot(hours, demand, 'o-', label='Demande réelle', 
-           color='#3498db', linewidth=3, markersize=7, alpha=0.9)
-    ax.plot(hours, baseline_hourly.values, 's-', label='Capacité baseline', 
-           color='#e74c3c', linewidth=2.5, markersize=6, alpha=0.7)
-    ax.plot(hours, optimized_supply, '^-', label='Capacité optimisée', 
-           color='#27ae60', linewidth=2.5, markersize=6, alpha=0.7)
+    # Parse unique via ast.literal_eval (pas d'eval par ligne - lent et risqué),
+    # puis somme des capacités des pompes actives via la table de correspondance
+    if 'pumps_active' in optimized_df.columns:
+        parsed = optimized_df['pumps_active'].fillna('').astype(str).map(
+            lambda s: ast.literal_eval(s) if s.startswith('[') else [])
+        optimized_supply = parsed.map(
+            lambda pumps: sum(pump_capacities.get(p, 0) for p in pumps)).to_numpy()
+    else:
+        optimized_supply = np.zeros(len(optimized_df))
     
+    # Tracer (les trois courbes en un seul LineCollection)
+    handles = _plot_lines_batched(
+        ax, hours, [demand, baseline_flow.to_numpy(), optimized_supply],
+        colors=['#3498db', '#e74c3c', '#27ae60'],
+        labels=['Demande réelle', 'Capacité baseline', 'Capacité optimisée'])
+
     ax.fill_between(hours, demand, alpha=0.2, color='#3498db')
-    
+
     ax.set_xlabel('Heure de la journée', fontsize=12, fontweight='bold')
     ax.set_ylabel('Débit (m³/h)', fontsize=12, fontweight='bold')
     ax.set_title('Demande en Eau vs Capacité de Pompage', fontsize=14, fontweight='bold')
-    ax.legend(loc='best', fontsize=11)
+    ax.legend(handles=handles, loc='best', fontsize=11)
     ax.grid(True, alpha=0.3)
     ax.set_xticks(hours)
     ax.set_xticklabels([f'{h}h' for h in hours], rotation=45, ha='right')
     
-    plt.tight_layout()
+    fig.tight_layout()
     
     os.makedirs(os.path.dirname(save_path), exist_ok=True)
-    plt.savefig(save_path, dpi=300, bbox_inches='tight')
+    fig.savefig(save_path, dpi=150, bbox_inches='tight',
+                pil_kwargs={'optimize': True, 'compress_level': 3})
     print(f"✅ Graphique demande/offre sauvegardé: {save_path}")
     
     return fig
@@ -296,58 +575,20 @@ def generate_summary_report(metrics, save_path="results/summary_report.txt"):
         print("⚠️  Pas de métriques disponibles pour le rapport")
         return
     
-    report = f"""
-{'='*70}
-                RAPPORT D'OPTIMISATION IRRIGATION
-                        AGRIWATER OPTIMIZER
-{'='*70}
-
-📊 RÉSULTATS FINANCIERS
-{'-'*70}
-
-Coût Baseline (non optimisé):      {metrics['baseline_cost_fcfa']:>15,.0f} FCFA
-Coût Optimisé:                      {metrics['optimized_cost_fcfa']:>15,.0f} FCFA
-                                    {'-'*15}
-ÉCONOMIES RÉALISÉES:                {metrics['savings_fcfa']:>15,.0f} FCFA
-Pourcentage de réduction:           {metrics['savings_percent']:>15.2f} %
+    # Valeurs pré-formatées une seule fois: le template constant est alors
+    # un simple remplissage de trous (pas de re-formatage par appel).
+    report = REPORT_TEMPLATE.format_map({
+        'baseline_cost': f"{metrics['baseline_cost_fcfa']:>15,.0f}",
+        'optimized_cost': f"{metrics['optimized_cost_fcfa']:>15,.0f}",
+        'savings': f"{metrics['savings_fcfa']:>15,.0f}",
+        'savings_percent': f"{metrics['savings_percent']:>15.2f}",
+        'monthly_projection': f"{metrics['monthly_projection_fcfa']:>15,.0f}",
+        'annual_projection': f"{metrics['annual_projection_fcfa']:>15,.0f}",
+        'solve_time': f"{metrics['solve_time_seconds']:>15.2f}",
+        'date': pd.Timestamp.now().strftime('%Y-%m-%d %H:%M:%S'),
+    })
 
 
-💰 PROJECTIONS
-{'-'*70}
-
-Économies mensuelles estimées:      {metrics['monthly_projection_fcfa']:>15,.0f} FCFA
-Économies annuelles estimées:       {metrics['annual_projection_fcfa']:>15,.0f} FCFA
-
-
-⚡ PERFORMANCE TECHNIQUE
-{'-'*70}
-
-Temps de résolution:                {metrics['solve_time_seconds']:>15.2f} secondes
-Méthode d'optimisation:             MILP (Mixed-Integer Linear Programming)
-Solveur utilisé:                    CBC (COIN-OR Branch and Cut)
-
-
-✅ CONCLUSION
-{'-'*70}
-
-L'optimisation mathématique du planning d'irrigation permet de réduire
-significativement les coûts opérationnels de la ferme en:
-
-1. Minimisant les pénalités de dépassement de puissance souscrite
-2. Profitant des tarifs heures creuses pour irrigation nocturne
-3. Limitant l'usure des équipements (démarrages optimisés)
-4. Maintenant l'approvisionnement en eau des cultures
-5. Intégrant la production solaire en journée
-
-ROI estimé du système: < 4 mois
-
-{'='*70}
-
-Généré par: AgriWater Optimizer
-Auteur: Abdoulaye Ouedraogo
-Date: {pd.Timestamp.now().strftime('%Y-%m-%d %H:%M:%S')}
-"""
-    
     os.makedirs(os.path.dirname(save_path), exist_ok=True)
     with open(save_path, 'w', encoding='utf-8') as f:
         f.write(report)
@@ -356,35 +597,101 @@ Date: {pd.Timestamp.now().strftime('%Y-%m-%d %H:%M:%S')}
     print(report)
 
 
+def _render_plot(plot_name, baseline_df, optimized_df, metrics, baseline_hourly=None):
+    """Rend un graphique dans un processus fils et retourne son chemin
+
+    Ferme la figure avant de retourner: seul le chemin traverse le pickle
+    inter-processus, jamais la figure elle-même.
+    """
+    if plot_name == 'cost_comparison':
+        fig = plot_cost_comparison(baseline_df, optimized_df, metrics,
+                                   baseline_hourly=baseline_hourly)
+        save_path = "results/cost_comparison.png"
+    elif plot_name == 'pump_schedule':
+        fig = plot_pump_schedule(optimized_df)
+        save_path = "results/pump_schedule.png"
+    elif plot_name == 'demand_supply':
+        fig = plot_demand_vs_supply(baseline_df, optimized_df,
+                                    baseline_hourly=baseline_hourly)
+        save_path = "results/demand_supply.png"
+    else:
+        raise ValueError(f"Graphique inconnu: {plot_name}")
+    plt.close(fig)
+    return save_path
+
+
+def _inputs_signature(input_files=("data/irrigation_data.csv",
+                                   "results/optimized_schedule.csv")):
+    """Empreinte blake2b des fichiers d'entrée des graphiques
+
+    Retourne None si un fichier manque (on laisse alors load_data
+    produire son message d'erreur habituel).
+    """
+    h = hashlib.blake2b()
+    for path in input_files:
+        try:
+            with open(path, 'rb') as f:
+                h.update(f.read())
+        except FileNotFoundError:
+            return None
+    return h.hexdigest()[:16]
+
+
 def main():
     """Fonction principale - génère toutes les visualisations"""
-    
+
     print("\n" + "="*70)
     print(" "*20 + "VISUALISATION RÉSULTATS")
     print("="*70)
-    
+
+    # Court-circuit: si les CSV d'entrée n'ont pas changé depuis la
+    # dernière exécution et que les sorties existent, rien à refaire
+    sig_path = "results/.viz_sig"
+    output_files = ["results/cost_comparison.png", "results/pump_schedule.png",
+                    "results/demand_supply.png"]
+    sig = _inputs_signature()
+    if sig is not None and all(os.path.exists(p) for p in output_files):
+        try:
+            with open(sig_path) as f:
+                if f.read().strip() == sig:
+                    print("\n✅ Données inchangées: graphiques déjà à jour, rien à régénérer\n")
+                    return
+        except FileNotFoundError:
+            pass
+
     # Charger données
     baseline_df, optimized_df, metrics = load_data()
-    
+
     if baseline_df is None or optimized_df is None:
         print("\n❌ Impossible de charger les données!")
         return
-    
+
     print("\n📈 Génération graphiques...")
-    
-    # 1. Comparaison coûts
-    plot_cost_comparison(baseline_df, optimized_df, metrics)
-    
-    # 2. Planning pompes
-    plot_pump_schedule(optimized_df)
-    
-    # 3. Demande vs offre
-    plot_demand_vs_supply(baseline_df, optimized_df)
-    
+
+    # Une seule passe de groupby horaire, partagée par les graphiques
+    baseline_hourly = aggregate_baseline_hourly(baseline_df)
+
+    # Les trois figures sont indépendantes (chemins de sortie distincts,
+    # aucun état partagé): on les rend dans des processus séparés, le
+    # backend Agg étant sans interface il supporte très bien ce découpage
+    plot_names = ['cost_comparison', 'pump_schedule', 'demand_supply']
+    with ProcessPoolExecutor(max_workers=len(plot_names)) as executor:
+        futures = [executor.submit(_render_plot, name,
+                                   baseline_df, optimized_df, metrics,
+                                   baseline_hourly)
+                   for name in plot_names]
+        for future in futures:
+            future.result()  # propage les exceptions éventuelles
+
     # 4. Rapport textuel
     if metrics:
         generate_summary_report(metrics)
-    
+
+    # Mémorise l'empreinte des entrées pour le court-circuit du prochain run
+    if sig is not None:
+        with open(sig_path, 'w') as f:
+            f.write(sig)
+
     print("\n" + "="*70)
     print("✅ VISUALISATIONS TERMINÉES")
     print("="*70)